@@ -1,25 +1,31 @@
+import numpy as np
 import streamlit as st
 import yfinance as yf
 from datetime import datetime, timedelta
 
+# Cached symbol probe; fast_info avoids the slow .info endpoint.
+# Errors propagate so st.cache_data never stores a failed probe.
+@st.cache_data(ttl=3600, show_spinner=False)
+def ticker_exists(t: str) -> bool:
+    fi = yf.Ticker(t).fast_info
+    lp = getattr(fi, "last_price", None)  # NaN for some delisted / illiquid symbols
+    return lp is not None and bool(np.isfinite(lp)) and lp > 0
+
+# Re-clicks with the same ticker and range are served from cache.
+# yfinance returns an empty frame on network errors; raising keeps it out of the cache.
+@st.cache_data(ttl=900, show_spinner="Fetching data...")
+def download_history(t: str, start, end):
+    data = yf.download(t, start=start, end=end, progress=False, threads=False)
+    if data.empty:
+        raise LookupError(f"no data for {t}")
+    return data
+
 # Title of the app
 st.title("Historical Stock and ETF Data Downloader with Trailing Stop Calculator")
 
 # Input for the stock ticker
 ticker = st.text_input("Enter the Ticker Symbol (e.g., AAPL, SPY):")
 
-# Check if ticker is valid when the user presses Enter
-if ticker:
-    try:
-        # Attempt to fetch data to verify ticker
-        test_data = yf.Ticker(ticker).info
-        if test_data:
-            st.success(f"Ticker '{ticker}' has been found.")
-        else:
-            st.error(f"Ticker '{ticker}' could not be found. Please check the symbol.")
-    except Exception:
-        st.error(f"Ticker '{ticker}' could not be found. Please check the symbol.")
-
 # Initialize session state for selected dates
 if "start_date" not in st.session_state:
     st.session_state.start_date = datetime.today() - timedelta(days=365)
@@ -58,17 +64,29 @@ st.session_state.end_date = manual_end_date
 
 # Button to download data and calculate trailing stop
 if st.button("Download Data and Calculate Trailing Stop"):
+    found = None
     if ticker:
+        try:
+            found = ticker_exists(ticker)
+        except Exception:
+            # Probe failed (timeout, rate limit, no price); let the download decide
+            found = None
+    if found is False:
+        st.error(f"Ticker '{ticker}' could not be found. Please check the symbol.")
+    elif ticker:
         try:
             # Fetching data from Yahoo Finance
-            data = yf.download(
-                ticker,
-                start=st.session_state.start_date,
-                end=st.session_state.end_date,
-            )
+            try:
+                data = download_history(
+                    ticker,
+                    st.session_state.start_date,
+                    st.session_state.end_date,
+                )
+            except LookupError:
+                data = None
             
             # Checking if data is retrieved
-            if not data.empty:
+            if data is not None:
                 # Creating a CSV for download
                 csv = data.to_csv().encode("utf-8")
                 
@@ -82,11 +100,12 @@ if st.button("Download Data and Calculate Trailing Stop"):
                 st.success(f"Data for {ticker} downloaded successfully!")
 
                 # Calculate trailing stop percentage
-                data['Daily_Range_Percent'] = (
-                    (data['High'] - data['Low']) / data['Low']
-                ) * 100
-                average_range_percent = data['Daily_Range_Percent'].mean()
-                std_dev_range_percent = data['Daily_Range_Percent'].std()
+                # ravel: single-ticker downloads may come back with (field, ticker) columns
+                hi = np.asarray(data['High'], dtype=float).ravel()
+                lo = np.asarray(data['Low'], dtype=float).ravel()
+                range_pct = (hi - lo) / lo * 100.0
+                average_range_percent = np.nanmean(range_pct)
+                std_dev_range_percent = np.nanstd(range_pct, ddof=1)
                 optimal_trailing_stop = average_range_percent + std_dev_range_percent
 
                 # Display trailing stop calculation
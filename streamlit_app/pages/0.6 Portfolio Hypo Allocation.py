@@ -11,13 +11,13 @@
 # - NEW: Purchasing Power (H3): use cash first, then VMFXX, then Shortfall.
 # - FIX: When using purchasing power, reduce CASH row MV_$ / QTY in scenario holdings.
 
-import csv
+import io
+import queue
 import re
 import numpy as np
 import pandas as pd
 import streamlit as st
-import yfinance as yf
-import requests
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
 N_BUYS = 10
@@ -165,11 +165,19 @@ def _to_float(x):
     except Exception:
         return pd.NA
 
-def _safe_text(file_bytes: bytes) -> str:
-    return file_bytes.decode("utf-8", errors="replace")
+def _to_float_series(s: pd.Series) -> pd.Series:
+    """Column-wise _to_float: same rules, run through the pandas string kernels."""
+    s = s.astype("string").str.strip()
+    neg = (s.str.startswith("(") & s.str.endswith(")")).fillna(False)
+    s = s.mask(neg, s.str.slice(1, -1))
+    s = s.str.replace(r"[$,%]", "", regex=True).str.strip().str.replace(r"^(-?)\.", r"\g<1>0.", regex=True)
+    v = pd.to_numeric(s.astype(object), errors="coerce").astype("float64")
+    return v.mask(neg, -v)
 
 @st.cache_data(ttl=60 * 10, show_spinner=False)
 def get_last_price_yf(ticker: str):
+    import yfinance as yf  # deferred: heavy import chain, only needed once a buy is priced
+
     try:
         t = yf.Ticker(ticker)
         hist = t.history(period="5d", auto_adjust=False)
@@ -179,49 +187,104 @@ def get_last_price_yf(ticker: str):
     except Exception:
         return None
 
+# Workers share yfinance's process-wide HTTP session. That is the same sharing
+# yf.download(threads=True) does for its own worker threads. No requests.Session
+# is created here, and the cap keeps the pool to a basket's size (N_BUYS).
+_YF_MAX_WORKERS = N_BUYS
+
+def get_last_prices_yf(tickers) -> dict:
+    """Price each distinct ticker once, concurrently; each goes through the cached get_last_price_yf."""
+    uniq = list(dict.fromkeys(tickers))
+    if len(uniq) <= 1:
+        return {t: get_last_price_yf(t) for t in uniq}
+    with ThreadPoolExecutor(max_workers=min(_YF_MAX_WORKERS, len(uniq))) as ex:
+        return dict(zip(uniq, ex.map(get_last_price_yf, uniq)))
+
+# Tight fast path first (label + value within a few tags); the wider scans only run if it misses.
+_SA_YIELD_PATTERNS = [
+    re.compile(r"Dividend\s*Yield[^%\d]{0,60}(\d+(?:\.\d+)?)\s*%", re.IGNORECASE),
+    re.compile(r"Dividend Yield[^0-9]{0,300}([\d.]+)\s*%", re.IGNORECASE | re.DOTALL),
+    re.compile(r"Dividend Yield\s*</[^>]+>\s*<[^>]+>\s*([\d.]+)\s*%", re.IGNORECASE | re.DOTALL),
+    re.compile(r"Dividend\s*Yield[^%]{0,300}([\d.]+)%", re.IGNORECASE | re.DOTALL),
+]
+
+SA_ETF_URL = "https://stockanalysis.com/etf/{}/dividend/"
+SA_STOCK_URL = "https://stockanalysis.com/stocks/{}/dividend/"
+SA_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10.15; rv:146.0) Gecko/20100101 Firefox/146.0"
+}
+
+@st.cache_resource(show_spinner=False)
+def _http_sessions():
+    # Idle sessions shared across reruns so repeat probes reuse TLS connections.
+    # requests.Session is not documented as thread-safe, so each fetch checks one
+    # out for its own use; the pool grows to the peak number of concurrent fetches.
+    return queue.SimpleQueue()
+
+def _fetch_sa_yield(url: str):
+    pool = _http_sessions()
+    try:
+        session = pool.get_nowait()
+    except queue.Empty:
+        import requests
+
+        session = requests.Session()
+        session.headers.update(SA_HEADERS)
+    try:
+        r = session.get(url, timeout=12)
+        if r.status_code != 200:
+            return None
+        html = r.text or ""
+        for pat in _SA_YIELD_PATTERNS:
+            m = pat.search(html)
+            if m:
+                v = _to_float(m.group(1))
+                if pd.notna(v):
+                    return float(v)
+    except Exception:
+        return None
+    finally:
+        pool.put(session)
+    return None
+
 @st.cache_data(ttl=60 * 60, show_spinner=False)
 def get_dividend_yield_stockanalysis(ticker: str):
     """
     Pull Dividend Yield % from StockAnalysis dividend page.
-    Tries ETF URL first, then Stocks URL.
+    Fetches the ETF and Stocks URLs concurrently; the ETF value wins whenever it has one.
     Returns float yield percent (e.g., 4.21) or None.
     """
     t = (ticker or "").strip().upper()
     if not t:
         return None
 
-    urls = [
-        f"https://stockanalysis.com/etf/{t}/dividend/",
-        f"https://stockanalysis.com/stocks/{t}/dividend/",
-    ]
+    urls = [SA_ETF_URL.format(t), SA_STOCK_URL.format(t)]
 
-    headers = {
-        "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10.15; rv:146.0) Gecko/20100101 Firefox/146.0"
-    }
-
-    patterns = [
-        r"Dividend Yield[^0-9]{0,300}([\d.]+)\s*%",
-        r"Dividend Yield\s*</[^>]+>\s*<[^>]+>\s*([\d.]+)\s*%",
-        r"Dividend\s*Yield[^%]{0,300}([\d.]+)%",
-    ]
-
-    for url in urls:
-        try:
-            r = requests.get(url, headers=headers, timeout=12)
-            if r.status_code != 200:
-                continue
-            html = r.text or ""
-            for pat in patterns:
-                m = re.search(pat, html, flags=re.IGNORECASE | re.DOTALL)
-                if m:
-                    v = _to_float(m.group(1))
-                    if pd.notna(v):
-                        return float(v)
-        except Exception:
-            continue
+    ex = ThreadPoolExecutor(max_workers=len(urls))
+    try:
+        futs = [ex.submit(_fetch_sa_yield, url) for url in urls]
+        # resolve in URL order (ETF first) so the answer doesn't depend on timing
+        for fut in futs:
+            y = fut.result()
+            if y is not None:
+                return y
+    finally:
+        ex.shutdown(wait=False, cancel_futures=True)
 
     return None
 
+def get_yields_bulk(tickers) -> dict:
+    """
+    Yield lookups for several tickers at once (basket auto-fill): the per-ticker
+    probes overlap instead of queueing behind each other's 12s timeouts.
+    Each ticker still goes through the cached get_dividend_yield_stockanalysis.
+    """
+    uniq = list(dict.fromkeys(tickers))
+    if len(uniq) <= 1:
+        return {t: get_dividend_yield_stockanalysis(t) for t in uniq}
+    with ThreadPoolExecutor(max_workers=min(10, len(uniq))) as ex:
+        return dict(zip(uniq, ex.map(get_dividend_yield_stockanalysis, uniq)))
+
 # =========================
 # Option parsing + grouping
 # =========================
@@ -229,69 +292,98 @@ _MONTH_MAP = {"Jan":1,"Feb":2,"Mar":3,"Apr":4,"May":6,"Jun":6,"Jul":7,"Aug":8,"S
 # NOTE: small typo: Apr:4, May:5 — fix:
 _MONTH_MAP["May"] = 5  # ensure May is 5
 
-def parse_option_symbol(sym: str):
-    s = str(sym).strip()
-    under = s.split(" ")[0].strip() if s else pd.NA
-
-    m = re.search(
-        r"\b(Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)\b\s+(\d{1,2})\s+'(\d{2})\s+\$([\d.]+)\s+\b(Put|Call)\b",
-        s
-    )
-    if not m:
-        return {"UNDER": under, "EXP_DT": pd.NaT, "STRIKE": pd.NA, "CP": pd.NA}
-
-    mon, day, yy, strike, cp = m.group(1), m.group(2), m.group(3), m.group(4), m.group(5)
-    year = 2000 + int(yy)
-    month = _MONTH_MAP.get(mon)
-
-    try:
-        exp = pd.Timestamp(year=year, month=month, day=int(day))
-    except Exception:
-        exp = pd.NaT
-
-    return {"UNDER": under, "EXP_DT": exp, "STRIKE": _to_float(strike), "CP": ("P" if cp.lower() == "put" else "C")}
-
-def group_options_under_equities(df: pd.DataFrame) -> pd.DataFrame:
+CP_TYPES = pd.CategoricalDtype(["C", "P"])
+
+# groups: month, day, 2-digit year, strike, Put/Call (extracted column-wise in group_options_under_equities)
+_OPT_PARSE_RE = re.compile(
+    r"\b(Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)\b\s+(\d{1,2})\s+'(\d{2})\s+\$([\d.]+)\s+\b(Put|Call)\b"
+)
+# month word AND Put/Call anywhere in the symbol (either order), in one scan
+_OPT_DETECT_RE = re.compile(
+    r"^(?=.*\b(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)\b)(?=.*\b(?:Put|Call)\b)",
+    re.DOTALL,
+)
+
+def _sort_codes(s: pd.Series, ascending: bool = True) -> np.ndarray:
+    # Dense integer rank for np.lexsort; missing values go last (like sort_values' na_position="last").
+    codes, uniques = pd.factorize(s, sort=True)
+    if not ascending:
+        codes = np.where(codes >= 0, len(uniques) - 1 - codes, codes)
+    return np.where(codes < 0, len(uniques), codes)
+
+def group_options_under_equities(df: pd.DataFrame, inplace: bool = False) -> pd.DataFrame:
+    # inplace=True: caller owns df (fresh parse / what-if working copy), so skip the defensive copy
     if df.empty or "SYM" not in df.columns or "SEC_TYPE" not in df.columns:
         return df
 
-    out = df.copy()
-    is_opt = out["SEC_TYPE"].astype(str).str.upper().eq("OPTION")
+    out = df if inplace else df.copy()
+    out["SYM"] = out["SYM"].astype("string")
+    is_opt = out["SEC_TYPE"].eq("OPTION")
 
-    for c in ["UNDER","EXP_DT","STRIKE","CP"]:
-        out[c] = pd.NA
-    parsed = out.loc[is_opt, "SYM"].apply(parse_option_symbol).apply(pd.Series)
-    out.loc[is_opt, ["UNDER","EXP_DT","STRIKE","CP"]] = parsed[["UNDER","EXP_DT","STRIKE","CP"]].values
+    opt_cols = ["UNDER","EXP_DT","STRIKE","CP"]
+    if set(opt_cols).issubset(out.columns):
+        # what-if regroup: option rows never change, so only parse ones not seen yet
+        todo = is_opt & out["UNDER"].isna()
+    else:
+        todo = is_opt
+        for c in opt_cols:
+            out[c] = pd.NA
+    if todo.any():
+        # one regex scan over the option symbols
+        opt_syms = out.loc[todo, "SYM"].str.strip()
+        ext = opt_syms.str.extract(_OPT_PARSE_RE)
+        ext.columns = ["MON","DAY","YY","STRIKE","CP"]
+        parsed = pd.DataFrame(index=opt_syms.index)
+        parsed["UNDER"] = opt_syms.str.split(" ", n=1).str[0].str.strip().mask(opt_syms.eq(""))
+        parsed["EXP_DT"] = pd.to_datetime(
+            pd.DataFrame({
+                "year": 2000 + ext["YY"].astype("float64"),
+                "month": ext["MON"].map(_MONTH_MAP).astype("float64"),
+                "day": ext["DAY"].astype("float64"),
+            }),
+            errors="coerce",
+        )
+        parsed["STRIKE"] = _to_float_series(ext["STRIKE"])
+        parsed["CP"] = ext["CP"].map({"Put": "P", "Call": "C"})
+        for c in opt_cols:
+            out.loc[todo, c] = parsed[c]
+    out["CP"] = out["CP"].astype(CP_TYPES)
 
-    out["GROUP"] = out["SYM"].astype(str)
-    out.loc[is_opt, "GROUP"] = out.loc[is_opt, "UNDER"].fillna(out.loc[is_opt, "SYM"]).astype(str)
+    out["GROUP"] = out["SYM"]
+    out.loc[is_opt, "GROUP"] = out.loc[is_opt, "UNDER"].fillna(out.loc[is_opt, "SYM"])
 
-    eq_groups = set(out.loc[~is_opt, "SYM"].astype(str).unique())
-    out["HAS_EQUITY"] = out["GROUP"].astype(str).isin(eq_groups)
+    # sort-only keys stay local so they never land in session state
+    eq_groups = set(out.loc[~is_opt, "SYM"].unique())
+    has_equity = out["GROUP"].isin(eq_groups)
 
     if "WGT_PCT" in out.columns:
         eq_weight = out.loc[~is_opt].set_index("SYM")["WGT_PCT"].to_dict()
-        out["GROUP_WGT"] = out["GROUP"].map(eq_weight)
-        out["GROUP_WGT"] = out["GROUP_WGT"].fillna(out.groupby("GROUP")["WGT_PCT"].transform("max"))
+        group_max = out.groupby("GROUP", sort=False)["WGT_PCT"].max()
+        group_wgt = out["GROUP"].map(eq_weight).fillna(out["GROUP"].map(group_max))
     else:
-        out["GROUP_WGT"] = 0.0
-
-    out["ROW_KIND"] = is_opt.astype(int)
-    out["EXP_SORT"] = pd.to_datetime(out["EXP_DT"], errors="coerce")
-    out["STRIKE_SORT"] = out["STRIKE"].map(_to_float)
-    out["CP_SORT"] = out["CP"].astype(str).replace({"<NA>": ""})
-
-    out.sort_values(
-        by=["HAS_EQUITY","GROUP_WGT","GROUP","ROW_KIND","EXP_SORT","STRIKE_SORT","CP_SORT"],
-        ascending=[False, False, True, True, True, True, True],
-        inplace=True
-    )
+        group_wgt = pd.Series(0.0, index=out.index)
 
-    out["DISPLAY_SYM"] = out["SYM"].astype(str)
-    out.loc[is_opt, "DISPLAY_SYM"] = "  ↳ " + out.loc[is_opt, "SYM"].astype(str)
+    # np.lexsort: last key is the primary one
+    keys = [
+        _sort_codes(out["GROUP"]),
+        _sort_codes(group_wgt, ascending=False),
+        _sort_codes(has_equity, ascending=False),
+    ]
+    if is_opt.any():
+        # option tie-breakers; all constant in an equity-only frame, so skipped there
+        keys[:0] = [
+            out["CP"].cat.codes.to_numpy(),  # -1 (no C/P) first, as "" did
+            _sort_codes(pd.to_numeric(out["STRIKE"], errors="coerce")),  # already parsed floats
+            _sort_codes(pd.to_datetime(out["EXP_DT"], errors="coerce")),
+            is_opt.to_numpy(dtype=np.int8),  # equity rows (0) before their options (1)
+        ]
+    order = np.lexsort(keys)
+    out = out.take(order)  # not iloc[]: that flags a SettingWithCopy slice while the caller still holds df
+
+    out["DISPLAY_SYM"] = out["SYM"]
+    out.loc[is_opt, "DISPLAY_SYM"] = "  ↳ " + out.loc[is_opt, "SYM"]
 
     out.reset_index(drop=True, inplace=True)
-    out.drop(columns=["EXP_SORT","STRIKE_SORT","CP_SORT"], inplace=True, errors="ignore")
     return out
 
 # =========================
@@ -302,146 +394,184 @@ HOLD_COLS_15 = [
     "DAY_$","DAY_PCT","DIV_YLD_PCT","DIV_PAY_DT","DIV_$","ACQ_DT"
 ]
 
-def parse_portfolio_text(text: str):
-    lines = text.replace("\r\n", "\n").replace("\r", "\n").split("\n")
+# no TOTAL category: TOTAL rows are dropped before _tag_sec_type runs
+SEC_TYPES = pd.CategoricalDtype(["EQUITY/ETF", "OPTION", "CASH"])
+
+# derived lookup columns: kept on the frame, never shown or exported
+_HELPER_COLS = ["SYM_U", "IS_INCOME"]
+
+def _tag_sec_type(df: pd.DataFrame) -> pd.DataFrame:
+    # SEC_TYPE as a small categorical + a cached income-eligible mask (everything except options/cash)
+    df["SEC_TYPE"] = df["SEC_TYPE"].astype(SEC_TYPES)
+    df["IS_INCOME"] = ~df["SEC_TYPE"].isin(["OPTION", "CASH"])
+    return df
+
+# Holdings block: rows after the "Symbol,% of Portfolio" header, up to a blank line / "Generated at" footer.
+# bytes pattern: the upload is sliced without decoding the whole file; \r is tolerated so CRLF needs no rewrite
+_HOLD_BLOCK_RE = re.compile(
+    rb"^Symbol,% of Portfolio[^\r\n]*\r?\n(.*?)(?=^[ \t\r]*$|^Generated at |\Z)",
+    re.MULTILINE | re.DOTALL,
+)
+
+@st.cache_data(show_spinner=False)
+def parse_portfolio_bytes(file_bytes: bytes):
+    if b"\n" not in file_bytes:
+        file_bytes = file_bytes.replace(b"\r", b"\n")  # bare-CR line endings
 
     holdings_df = pd.DataFrame()
-    hold_hdr_idx = next((i for i, l in enumerate(lines) if l.startswith("Symbol,% of Portfolio")), None)
-    if hold_hdr_idx is not None:
-        rows = []
-        for j in range(hold_hdr_idx + 1, len(lines)):
-            if lines[j].strip() == "" or lines[j].startswith("Generated at "):
-                break
-            rows.append(next(csv.reader([lines[j]])))
-
-        norm_rows = []
-        for r in rows:
-            if len(r) >= 15:
-                norm_rows.append(r[:15])
-            else:
-                norm_rows.append(r + [""] * (15 - len(r)))
-
-        holdings_df = pd.DataFrame(norm_rows, columns=HOLD_COLS_15)
+    m = _HOLD_BLOCK_RE.search(file_bytes)
+    if m is not None:
+        body = m.group(1)
+        if body.strip():
+            # usecols truncates long rows; short rows are padded with "" (not NaN, since
+            # na_filter=False), same as the old per-line csv.reader loop
+            holdings_df = pd.read_csv(
+                io.BytesIO(body),
+                header=None,
+                encoding="utf-8",
+                encoding_errors="replace",
+                names=HOLD_COLS_15,
+                usecols=range(15),
+                dtype=str,
+                engine="c",
+                keep_default_na=False,
+                na_filter=False,
+            )
+        else:
+            holdings_df = pd.DataFrame(columns=HOLD_COLS_15)
 
         num_cols = ["WGT_PCT","LAST","COST_SH","QTY","COST_TOT","GAIN_$","MV_$","GAIN_PCT","DAY_$","DAY_PCT","DIV_YLD_PCT","DIV_$"]
-        for c in num_cols:
-            holdings_df[c] = holdings_df[c].map(_to_float)
+        # all numeric cells stacked into one column -> one _to_float_series call
+        stacked = pd.Series(holdings_df[num_cols].to_numpy(dtype=object).ravel(order="F"))
+        holdings_df[num_cols] = _to_float_series(stacked).to_numpy().reshape(len(num_cols), -1).T
 
         for dc in ["DIV_PAY_DT","ACQ_DT"]:
             holdings_df[dc] = pd.to_datetime(holdings_df[dc], errors="coerce")
 
-        sym_u = holdings_df["SYM"].astype(str).str.upper()
-        opt_mask = holdings_df["SYM"].astype(str).str.contains(r"\b(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)\b", regex=True) & \
-                   holdings_df["SYM"].astype(str).str.contains(r"\b(?:Put|Call)\b", regex=True)
+        sym_str = holdings_df["SYM"].astype(str)
+        sym_u = sym_str.str.upper()
+        opt_mask = sym_str.str.contains(_OPT_DETECT_RE)
 
         holdings_df["SEC_TYPE"] = "EQUITY/ETF"
         holdings_df.loc[opt_mask, "SEC_TYPE"] = "OPTION"
         holdings_df.loc[sym_u.eq("CASH"), "SEC_TYPE"] = "CASH"
         holdings_df.loc[sym_u.eq("TOTAL"), "SEC_TYPE"] = "TOTAL"
+        holdings_df["SYM_U"] = sym_u  # upper-cased once here; what-if edits set it per row
 
-        holdings_df = holdings_df[holdings_df["SEC_TYPE"] != "TOTAL"].copy()
-        holdings_df = group_options_under_equities(holdings_df)
+        holdings_df = _tag_sec_type(holdings_df[holdings_df["SEC_TYPE"] != "TOTAL"].copy())
+        holdings_df = group_options_under_equities(holdings_df, inplace=True)
 
     return holdings_df
 
 # =========================
 # Yield math
 # =========================
-def apply_yield_overrides(df: pd.DataFrame, overrides: dict) -> pd.Series:
-    y = pd.to_numeric(df.get("DIV_YLD_PCT", 0), errors="coerce").fillna(0.0).astype(float)
-    if overrides:
-        sym = df["SYM"].astype(str).str.upper()
-        for k, v in overrides.items():
-            if v is None or (isinstance(v, float) and np.isnan(v)):
-                continue
-            y = np.where(sym.eq(str(k).upper()), float(v), y)
-    return pd.Series(y, index=df.index)
-
-def dividend_dollars_annual(holdings: pd.DataFrame, overrides: dict = None) -> float:
-    if holdings is None or holdings.empty:
-        return float("nan")
-    df = holdings.copy()
-    df["MV_$"] = pd.to_numeric(df["MV_$"], errors="coerce").fillna(0.0)
-
-    sec = df["SEC_TYPE"].astype(str).str.upper()
-    is_opt_or_cash = sec.isin(["OPTION", "CASH"])
+def apply_yield_overrides(df: pd.DataFrame, overrides: dict) -> np.ndarray:
+    y = pd.to_numeric(df.get("DIV_YLD_PCT", 0), errors="coerce").fillna(0.0).to_numpy(dtype=np.float64)
+    if not overrides:
+        return y  # default: VMFXX override left blank
+
+    clean = {
+        str(k).upper(): float(v)
+        for k, v in overrides.items()
+        if not (v is None or (isinstance(v, float) and np.isnan(v)))
+    }
+    if not clean:
+        return y
 
-    y = apply_yield_overrides(df, overrides or {})
-    y = np.where(is_opt_or_cash, 0.0, y)
+    # one hash lookup per row instead of one full scan per override
+    hit = df["SYM_U"].map(clean).to_numpy(dtype=np.float64, na_value=np.nan)
+    return np.where(np.isnan(hit), y, hit)
 
-    return float((df["MV_$"] * (y / 100.0)).sum())
+def _stat_sums_np(mv, y, excl):
+    # (dividend $, total MV, income MV, income dividend $); income = not excluded and yield > 0
+    d = mv * np.where(excl, 0.0, y) * 0.01
+    income = (y > 0.0) & ~excl
+    return float(d.sum()), float(mv.sum()), float(mv[income].sum()), float(d[income].sum())
 
-def holdings_yield_pct(holdings: pd.DataFrame, overrides: dict = None) -> float:
-    if holdings is None or holdings.empty:
-        return float("nan")
-    mv_total = float(pd.to_numeric(holdings["MV_$"], errors="coerce").fillna(0.0).sum())
-    if mv_total <= 0:
-        return float("nan")
-    div_usd = dividend_dollars_annual(holdings, overrides=overrides)
-    return float(div_usd / mv_total * 100.0)
-
-def etrade_like_yield_pct(holdings: pd.DataFrame, overrides: dict = None) -> float:
+def _portfolio_stats(holdings: pd.DataFrame, overrides: dict = None) -> dict:
+    """
+    Single pass over MV_$ / DIV_YLD_PCT / IS_INCOME for every headline number:
+    div (annual dividend $), hy (holdings yield %), ey (E*TRADE-like yield %), mv (holdings MV $).
+    """
+    nan = float("nan")
     if holdings is None or holdings.empty:
-        return float("nan")
+        return {"div": nan, "hy": nan, "ey": nan, "mv": nan}
 
-    df = holdings.copy()
-    df["MV_$"] = pd.to_numeric(df["MV_$"], errors="coerce").fillna(0.0)
-    sec = df["SEC_TYPE"].astype(str).str.upper()
+    mv = pd.to_numeric(holdings["MV_$"], errors="coerce").fillna(0.0).to_numpy(dtype=np.float64)
+    excl = ~holdings["IS_INCOME"].to_numpy(dtype=np.bool_)
+    y = apply_yield_overrides(holdings, overrides or {})
 
-    y = apply_yield_overrides(df, overrides or {})
-    y = np.where(sec.isin(["OPTION", "CASH"]), 0.0, y)
+    div, mv_total, income_mv, income_div = _stat_sums_np(mv, y, excl)
 
-    income_mask = (y > 0.0) & (~sec.isin(["OPTION", "CASH"]))
-    income_mv = float(df.loc[income_mask, "MV_$"].sum())
-    if income_mv <= 0:
-        return float("nan")
-
-    income_div = float((df.loc[income_mask, "MV_$"] * (y[income_mask] / 100.0)).sum())
-    return float(income_div / income_mv * 100.0)
+    return {
+        "div": div,
+        "hy": float(div / mv_total * 100.0) if mv_total > 0 else nan,
+        "ey": float(income_div / income_mv * 100.0) if income_mv > 0 else nan,
+        "mv": mv_total,
+    }
 
 # =========================
-# What-if: sell VMFXX -> buy new (single, with optional VMFXX cap + price override)
+# What-if: sell VMFXX -> buy new (per-buy helpers, optional VMFXX cap)
 # =========================
-def _num(df, idx, col, default=np.nan):
-    try:
-        v = pd.to_numeric(df.loc[idx, col], errors="coerce")
-        if pd.isna(v):
-            return default
-        return float(v)
-    except Exception:
-        return default
+def _row_nums(df: pd.DataFrame, idx, defaults: dict) -> dict:
+    # one positional read of several numeric fields; NaN / unparseable -> that column's default
+    raw = df.iloc[df.index.get_loc(idx), df.columns.get_indexer(list(defaults))]
+    vals = pd.to_numeric(raw, errors="coerce").to_numpy(dtype=np.float64, na_value=np.nan)
+    return {c: (d if np.isnan(v) else float(v)) for (c, d), v in zip(defaults.items(), vals)}
+
+def _set_row(df: pd.DataFrame, idx, values: dict):
+    # single positional write instead of one label-aligned .loc setitem per column
+    df.iloc[df.index.get_loc(idx), df.columns.get_indexer(list(values))] = list(values.values())
+
+def _merge_buy(prev: dict, px: float, buy_qty: float, buy_mv: float, buy_yield_pct: float) -> dict:
+    """Average a buy into a held position; prev has its QTY / COST_SH / COST_TOT / LAST / MV_$."""
+    prev_qty = prev["QTY"]
+    prev_cost_sh = prev["COST_SH"]
+    prev_cost_tot = prev["COST_TOT"]
+
+    if not np.isfinite(prev_cost_tot) or prev_cost_tot <= 0:
+        if np.isfinite(prev_cost_sh) and prev_qty > 0:
+            prev_cost_tot = prev_qty * prev_cost_sh
+        else:
+            prev_last = prev["LAST"]
+            prev_cost_tot = prev_qty * (prev_last if np.isfinite(prev_last) else px)
+
+    new_purchase_cost = buy_qty * px
+    new_total_cost = prev_cost_tot + new_purchase_cost
+    new_total_qty = prev_qty + buy_qty
+    new_cost_sh = (new_total_cost / new_total_qty) if new_total_qty > 0 else px
+
+    mv_now = prev["MV_$"] + buy_mv
+    gain_now = mv_now - new_total_cost
+    return {
+        "QTY": new_total_qty,
+        "MV_$": mv_now,
+        "LAST": px,
+        "DIV_YLD_PCT": buy_yield_pct,
+        "COST_TOT": new_total_cost,
+        "COST_SH": new_cost_sh,
+        "GAIN_$": gain_now,
+        "GAIN_PCT": (gain_now / new_total_cost * 100.0) if new_total_cost > 0 else 0.0,
+    }
 
-def apply_sell_vmfxx_buy_new(
-    holdings: pd.DataFrame,
+def _apply_buy(
+    df: pd.DataFrame,
+    pending: dict,
     buy_ticker: str,
     buy_qty: float,
     buy_yield_pct: float,
+    px: float,
     vmfxx_sell_max_mv: float = None,
-    buy_price_override: float = None,
-):
+) -> dict:
     """
-    Apply a single buy funded by selling VMFXX.
-    vmfxx_sell_max_mv: optional cap on how much VMFXX MV to sell for this buy.
-    buy_price_override: optional last price, to avoid re-calling yfinance if already fetched.
+    Sell VMFXX and book one buy, editing df in place.
+    Tickers not held yet are collected in `pending` (ticker -> new row) so the
+    caller can append all of them with a single concat in _finish_buys.
     """
-    df = holdings.copy()
-
-    buy_ticker = (buy_ticker or "").strip().upper()
-    if not buy_ticker:
-        raise ValueError("Buy ticker is blank.")
-
-    if buy_price_override is not None:
-        px = float(buy_price_override)
-    else:
-        px = get_last_price_yf(buy_ticker)
-        if px is None:
-            raise ValueError(f"Could not fetch price for {buy_ticker} from yfinance.")
-
-    buy_qty = float(buy_qty)
-    buy_yield_pct = float(buy_yield_pct)
     buy_mv = px * buy_qty
 
-    vm_mask = (df["SYM"].astype(str).str.upper() == "VMFXX") & (df["SEC_TYPE"].astype(str).str.upper() != "OPTION")
+    vm_mask = df["SYM_U"].eq("VMFXX") & df["SEC_TYPE"].ne("OPTION")
     if vm_mask.sum() == 0:
         raise ValueError("VMFXX row not found in holdings.")
     vm_idx = df.index[vm_mask][0]
@@ -460,57 +590,27 @@ def apply_sell_vmfxx_buy_new(
     sold_mv = min(vm_mv, vm_target)
     shortfall = max(0.0, buy_mv - sold_mv)
 
-    df.loc[vm_idx, "MV_$"] = vm_mv - sold_mv
-    df.loc[vm_idx, "QTY"] = df.loc[vm_idx, "MV_$"]   # VMFXX ~ $1 NAV
-    df.loc[vm_idx, "LAST"] = 1.0
+    # one positional write per row: VMFXX ~ $1 NAV, so QTY tracks MV
+    _set_row(df, vm_idx, {"MV_$": vm_mv - sold_mv, "QTY": vm_mv - sold_mv, "LAST": 1.0})
 
-    eq_mask = (df["SYM"].astype(str).str.upper() == buy_ticker) & (df["SEC_TYPE"].astype(str).str.upper() == "EQUITY/ETF")
+    eq_mask = df["SYM_U"].eq(buy_ticker) & df["SEC_TYPE"].eq("EQUITY/ETF")
     if eq_mask.sum() > 0:
         idx = df.index[eq_mask][0]
+        prev = _row_nums(df, idx, {"QTY": 0.0, "COST_SH": np.nan, "COST_TOT": np.nan, "LAST": px, "MV_$": 0.0})
+        updates = _merge_buy(prev, px, buy_qty, buy_mv, buy_yield_pct)
+        updates.update({"DISPLAY_SYM": buy_ticker, "GROUP": buy_ticker})
+        _set_row(df, idx, updates)
 
-        prev_qty = _num(df, idx, "QTY", default=0.0)
-        prev_cost_sh = _num(df, idx, "COST_SH", default=np.nan)
-        prev_cost_tot = _num(df, idx, "COST_TOT", default=np.nan)
-
-        if not np.isfinite(prev_cost_tot) or prev_cost_tot <= 0:
-            if np.isfinite(prev_cost_sh) and prev_qty > 0:
-                prev_cost_tot = prev_qty * prev_cost_sh
-            else:
-                prev_last = _num(df, idx, "LAST", default=px)
-                prev_cost_tot = prev_qty * (prev_last if np.isfinite(prev_last) else px)
-
-        new_purchase_cost = buy_qty * px
-        new_total_cost = prev_cost_tot + new_purchase_cost
-        new_total_qty = prev_qty + buy_qty
-        new_cost_sh = (new_total_cost / new_total_qty) if new_total_qty > 0 else px
-
-        df.loc[idx, "QTY"] = new_total_qty
-        df.loc[idx, "MV_$"] = _num(df, idx, "MV_$", default=0.0) + buy_mv
-        df.loc[idx, "LAST"] = px
-        df.loc[idx, "DIV_YLD_PCT"] = buy_yield_pct
-
-        df.loc[idx, "COST_TOT"] = new_total_cost
-        df.loc[idx, "COST_SH"] = new_cost_sh
-
-        mv_now = _num(df, idx, "MV_$", default=0.0)
-        gain_now = mv_now - new_total_cost
-        df.loc[idx, "GAIN_$"] = gain_now
-        df.loc[idx, "GAIN_PCT"] = (gain_now / new_total_cost * 100.0) if new_total_cost > 0 else 0.0
-
-        df.loc[idx, "DISPLAY_SYM"] = buy_ticker
-        df.loc[idx, "GROUP"] = buy_ticker
-        df.loc[idx, "HAS_EQUITY"] = True
-        df.loc[idx, "ROW_KIND"] = 0
+    elif buy_ticker in pending:
+        # second buy of a ticker added earlier in the same basket
+        row = pending[buy_ticker]
+        row.update(_merge_buy(row, px, buy_qty, buy_mv, buy_yield_pct))
 
     else:
-        for col in ["DISPLAY_SYM","SEC_TYPE","UNDER","EXP_DT","STRIKE","CP","GROUP","HAS_EQUITY","GROUP_WGT","ROW_KIND"]:
-            if col not in df.columns:
-                df[col] = pd.NA
-
-        new_row = {c: pd.NA for c in df.columns}
-        new_row.update({
+        pending[buy_ticker] = {
             "DISPLAY_SYM": buy_ticker,
             "SYM": buy_ticker,
+            "SYM_U": buy_ticker,
             "WGT_PCT": pd.NA,
             "LAST": px,
             "COST_SH": px,
@@ -530,26 +630,35 @@ def apply_sell_vmfxx_buy_new(
             "EXP_DT": pd.NaT,
             "STRIKE": pd.NA,
             "CP": pd.NA,
-            "GROUP": buy_ticker,
-            "HAS_EQUITY": True,
-            "GROUP_WGT": pd.NA,
-            "ROW_KIND": 0
-        })
-        df = pd.concat([df, pd.DataFrame([new_row])], ignore_index=True)
-
-    df["MV_$"] = pd.to_numeric(df["MV_$"], errors="coerce").fillna(0.0)
-    total_mv = float(df["MV_$"].sum())
-    df["WGT_PCT"] = np.where(total_mv > 0, df["MV_$"] / total_mv * 100.0, 0.0)
-
-    df = group_options_under_equities(df)
-    return df, {
+            "GROUP": buy_ticker
+        }
+
+    return {
         "buy_price": px,
         "buy_mv": buy_mv,
         "sold_vmfxx_mv": sold_mv,
         "shortfall_mv": shortfall,
-        "holdings_total_mv": total_mv
     }
 
+def _finish_buys(df: pd.DataFrame, pending: dict):
+    """Append pending new rows in one concat, then refresh weights + grouping. Returns (df, total_mv)."""
+    if pending:
+        # parsed frames already carry these; add any missing ones in one assign
+        missing = [c for c in ["DISPLAY_SYM","SEC_TYPE","UNDER","EXP_DT","STRIKE","CP","GROUP"] if c not in df.columns]
+        if missing:
+            df = df.assign(**dict.fromkeys(missing, pd.NA))
+        new_rows = pd.DataFrame(list(pending.values()), columns=df.columns)
+        df = pd.concat([df, new_rows], ignore_index=True)
+        df = _tag_sec_type(df)
+
+    mv = pd.to_numeric(df["MV_$"], errors="coerce").fillna(0.0).to_numpy(dtype=np.float64)
+    total_mv = float(mv.sum())
+    df["MV_$"] = mv
+    df["WGT_PCT"] = mv * (100.0 / total_mv) if total_mv > 0 else 0.0
+
+    df = group_options_under_equities(df, inplace=True)
+    return df, total_mv
+
 # =========================
 # What-if: basket buys (up to 10) with Purchasing Power
 # =========================
@@ -570,19 +679,21 @@ def apply_sell_vmfxx_buy_basket(
         raise ValueError("Holdings are empty.")
 
     df = holdings.copy()
-    details = []
+    pending = {}
+    # column lists (not row dicts) so details_df is built straight from columns
+    details = {c: [] for c in ["Ticker","Qty","Yield %","Price","Buy MV $","Cash Used $","Sold VMFXX $","Shortfall $"]}
     total_buy_mv = 0.0
     total_sold_vmfxx = 0.0
     total_shortfall = 0.0
     total_pp_used = 0.0
 
     # validate VMFXX exists once up-front
-    vm_mask = (df["SYM"].astype(str).str.upper() == "VMFXX") & (df["SEC_TYPE"].astype(str).str.upper() != "OPTION")
+    vm_mask = df["SYM_U"].eq("VMFXX") & df["SEC_TYPE"].ne("OPTION")
     if vm_mask.sum() == 0:
         raise ValueError("VMFXX row not found in holdings.")
 
     # Locate CASH row (if any)
-    cash_mask = (df["SYM"].astype(str).str.upper() == "CASH") & (df["SEC_TYPE"].astype(str).str.upper() == "CASH")
+    cash_mask = df["SYM_U"].eq("CASH") & df["SEC_TYPE"].eq("CASH")
     cash_idx = None
     cash_mv_remaining = 0.0
     if cash_mask.sum() > 0:
@@ -608,6 +719,8 @@ def apply_sell_vmfxx_buy_basket(
     else:
         cash_remaining = 0.0
 
+    # validate rows first so every distinct ticker is priced in one concurrent batch
+    rows = []
     for b in buys:
         t = (b.get("ticker") or "").strip().upper()
         q = b.get("qty", 0.0)
@@ -626,9 +739,13 @@ def apply_sell_vmfxx_buy_basket(
             yf_ = float(y)
         except Exception:
             yf_ = 0.0
+        rows.append((t, qf, yf_))
+
+    prices = get_last_prices_yf(t for t, _, _ in rows)
 
+    for t, qf, yf_ in rows:
         # Get price once here for cash logic
-        px = get_last_price_yf(t)
+        px = prices.get(t)
         if px is None:
             raise ValueError(f"Could not fetch price for {t} from yfinance.")
         buy_mv = px * qf
@@ -647,50 +764,43 @@ def apply_sell_vmfxx_buy_basket(
                 cash_mv_remaining -= reduce_amt
                 if cash_mv_remaining < 0:
                     cash_mv_remaining = 0.0
-                df.loc[cash_idx, "MV_$"] = cash_mv_remaining
                 # For consistency, set QTY equal to MV_$ (CASH ~ dollar balance)
-                df.loc[cash_idx, "QTY"] = cash_mv_remaining
+                _set_row(df, cash_idx, {"MV_$": cash_mv_remaining, "QTY": cash_mv_remaining})
 
         # Remaining funding needed from VMFXX
         vm_needed = buy_mv - cash_used
         if vm_needed < 0:
             vm_needed = 0.0
 
-        # Apply VMFXX sale + position update
-        df, info = apply_sell_vmfxx_buy_new(
-            df,
-            buy_ticker=t,
-            buy_qty=qf,
-            buy_yield_pct=yf_,
-            vmfxx_sell_max_mv=vm_needed,
-            buy_price_override=px,
-        )
+        # Apply VMFXX sale + position update (new tickers are appended once, after the loop)
+        info = _apply_buy(df, pending, t, qf, yf_, float(px), vmfxx_sell_max_mv=vm_needed)
 
         sold_vmfxx_mv = float(info["sold_vmfxx_mv"])
 
         # Anything not covered by Purchasing Power + VMFXX is Shortfall
         shortfall_row = max(0.0, buy_mv - (cash_used + sold_vmfxx_mv))
 
-        details.append({
-            "Ticker": t,
-            "Qty": qf,
-            "Yield %": yf_,
-            "Price": float(info["buy_price"]),
-            "Buy MV $": float(info["buy_mv"]),
-            "Cash Used $": float(cash_used),
-            "Sold VMFXX $": float(sold_vmfxx_mv),
-            "Shortfall $": float(shortfall_row),
-        })
+        row = (
+            t,
+            qf,
+            yf_,
+            float(info["buy_price"]),
+            float(info["buy_mv"]),
+            float(cash_used),
+            float(sold_vmfxx_mv),
+            float(shortfall_row),
+        )
+        for col, v in zip(details.values(), row):
+            col.append(v)
 
         total_buy_mv += float(info["buy_mv"])
         total_sold_vmfxx += float(sold_vmfxx_mv)
         total_shortfall += float(shortfall_row)
 
-    if not details:
+    if not details["Ticker"]:
         raise ValueError("No valid buy rows found (need ticker + qty > 0).")
 
-    df["MV_$"] = pd.to_numeric(df["MV_$"], errors="coerce").fillna(0.0)
-    total_mv = float(df["MV_$"].sum())
+    df, total_mv = _finish_buys(df, pending)
 
     return df, {
         "total_buy_mv": total_buy_mv,
@@ -742,40 +852,50 @@ def fmt_money_delta(x):
     except Exception:
         return ""
 
+def _fmt_col(s: pd.Series, fmt: str) -> pd.Series:
+    # column version of fmt_money / fmt_pct4: one numeric coercion, blanks for NaN, no per-cell try/except
+    v = pd.to_numeric(s, errors="coerce").to_numpy(dtype=np.float64, na_value=np.nan)
+    ok = ~np.isnan(v)
+    out = np.full(v.size, "", dtype=object)
+    out[ok] = [fmt.format(x) for x in v[ok]]
+    return pd.Series(out, index=s.index)
+
+@st.cache_data(show_spinner=False)
 def pretty_holdings(df: pd.DataFrame) -> pd.DataFrame:
     if df is None or df.empty:
         return df
-    out = df.copy()
 
     front = ["DISPLAY_SYM","SEC_TYPE","WGT_PCT","MV_$","DIV_YLD_PCT","LAST","QTY","COST_SH","COST_TOT","GAIN_$","GAIN_PCT"]
-    cols = front + [c for c in out.columns if c not in front]
-    cols = [c for c in cols if c in out.columns]
-    out = out[cols]
+    cols = front + [c for c in df.columns if c not in front and c not in _HELPER_COLS]
+    cols = [c for c in cols if c in df.columns]
+    out = df.reindex(columns=cols)  # the one copy; formatted columns are replaced below
 
-    if "WGT_PCT" in out.columns:
-        out["WGT_PCT"] = out["WGT_PCT"].apply(lambda v: fmt_pct4(v))
-    if "DIV_YLD_PCT" in out.columns:
-        out["DIV_YLD_PCT"] = out["DIV_YLD_PCT"].apply(lambda v: fmt_pct4(v))
-    if "GAIN_PCT" in out.columns:
-        out["GAIN_PCT"] = out["GAIN_PCT"].apply(lambda v: fmt_pct4(v))
+    for c in ["WGT_PCT","DIV_YLD_PCT","GAIN_PCT"]:
+        if c in out.columns:
+            out[c] = _fmt_col(out[c], "{:.4f}%")
 
     for c in ["MV_$","LAST","COST_SH","COST_TOT","GAIN_$","DAY_$","DIV_$"]:
         if c in out.columns:
-            out[c] = out[c].apply(lambda v: fmt_money(v))
+            out[c] = _fmt_col(out[c], "${:,.2f}")
     return out
 
 def pretty_basket_details(df: pd.DataFrame) -> pd.DataFrame:
     if df is None or df.empty:
         return df
     out = df.copy()
-    out["Qty"] = out["Qty"].map(lambda v: f"{float(v):,.4f}")
-    out["Yield %"] = out["Yield %"].map(lambda v: fmt_pct4(v))
-    out["Price"] = out["Price"].map(lambda v: fmt_money(v))
+    out["Qty"] = _fmt_col(out["Qty"], "{:,.4f}")
+    out["Yield %"] = _fmt_col(out["Yield %"], "{:.4f}%")
+    out["Price"] = _fmt_col(out["Price"], "${:,.2f}")
     for c in ["Buy MV $","Cash Used $","Sold VMFXX $","Shortfall $"]:
         if c in out.columns:
-            out[c] = out[c].map(lambda v: fmt_money(v))
+            out[c] = _fmt_col(out[c], "${:,.2f}")
     return out
 
+@st.cache_data(show_spinner=False)
+def _df_to_csv_bytes(df: pd.DataFrame) -> bytes:
+    # Streamlit hashes the frame, so download payloads are only re-serialized when the data changes.
+    return df.drop(columns=_HELPER_COLS, errors="ignore").to_csv(index=False).encode("utf-8")
+
 # =========================
 # What-if compare renderer (STREAMLIT NATIVE)
 # =========================
@@ -856,6 +976,24 @@ def add_qty_row(i: int, delta: float):
     cur = float(cur) if pd.notna(cur) else 0.0
     st.session_state[key] = f"{cur + float(delta):.0f}"
 
+def upper_ticker_row(i: int):
+    key = f"buy_ticker_{i}"
+    st.session_state[key] = (st.session_state.get(key) or "").strip().upper()
+
+def clear_state():
+    # runs before the next render, so widget keys can be reset without st.rerun()
+    st.session_state.hold_df = None
+    st.session_state.last_scenario_df = None
+    st.session_state.last_whatif_payload = None
+    st.session_state.last_basket_details = None
+    for i in range(N_BUYS):
+        st.session_state[f"buy_ticker_{i}"] = ""
+        st.session_state[f"buy_qty_{i}"] = "0"
+        st.session_state[f"buy_yield_{i}"] = "0"
+        st.session_state[f"last_yield_ticker_{i}"] = ""
+    st.session_state.pp_cash_str = ""
+    st.session_state.use_pp_first = True
+
 # =========================
 # Upload + calibrate + actions
 # =========================
@@ -889,7 +1027,7 @@ with top3:
     )
     st.subheader("ACTIONS")
     parse_clicked = st.button("PARSE FILE", use_container_width=True)
-    clear_clicked = st.button("CLEAR STATE", use_container_width=True)
+    st.button("CLEAR STATE", use_container_width=True, on_click=clear_state)
 
 # =========================
 # Basket UI
@@ -897,11 +1035,16 @@ with top3:
 st.subheader("VMFXX → BUY (WHAT-IF) — BASKET (up to 10 rows)")
 st.caption(NOTE_BASKET)
 
-# auto-fill yields on ticker change (row-by-row)
+# auto-fill yields on ticker change (all changed rows fetched together)
+changed = {}
 for i in range(N_BUYS):
     t = (st.session_state.get(f"buy_ticker_{i}") or "").strip().upper()
     if t and t != st.session_state.get(f"last_yield_ticker_{i}", ""):
-        y = get_dividend_yield_stockanalysis(t)
+        changed[i] = t
+if changed:
+    fetched = get_yields_bulk(changed.values())
+    for i, t in changed.items():
+        y = fetched.get(t)
         if y is not None:
             st.session_state[f"buy_yield_{i}"] = f"{y:.4f}"
         st.session_state[f"last_yield_ticker_{i}"] = t
@@ -921,6 +1064,8 @@ for i in range(N_BUYS):
             f"Buy Ticker #{i+1}",
             key=f"buy_ticker_{i}",
             label_visibility="collapsed",
+            on_change=upper_ticker_row,
+            args=(i,),
             help="Auto uppercased; yield auto-fills when ticker changes.",
         )
 
@@ -954,20 +1099,6 @@ st.caption(NOTE_YIELD)
 run_clicked = st.button("RUN WHAT-IF (BASKET)", use_container_width=True)
 st.divider()
 
-if clear_clicked:
-    st.session_state.hold_df = None
-    st.session_state.last_scenario_df = None
-    st.session_state.last_whatif_payload = None
-    st.session_state.last_basket_details = None
-    for i in range(N_BUYS):
-        st.session_state[f"buy_ticker_{i}"] = ""
-        st.session_state[f"buy_qty_{i}"] = "0"
-        st.session_state[f"buy_yield_{i}"] = "0"
-        st.session_state[f"last_yield_ticker_{i}"] = ""
-    st.session_state.pp_cash_str = ""
-    st.session_state.use_pp_first = True
-    st.rerun()
-
 def overrides_dict():
     d = {}
     if vmfxx_override is not None and not (isinstance(vmfxx_override, float) and np.isnan(vmfxx_override)):
@@ -979,8 +1110,7 @@ if parse_clicked:
         st.error("Upload a CSV first.")
     else:
         try:
-            text = _safe_text(f.getvalue())
-            hold_df = parse_portfolio_text(text)
+            hold_df = parse_portfolio_bytes(f.getvalue())
             st.session_state.hold_df = hold_df
             st.success("Parsed successfully.")
         except Exception as e:
@@ -988,18 +1118,16 @@ if parse_clicked:
 
 hold_df = st.session_state.hold_df
 ovr = overrides_dict()
+base_stats = None
 
 if hold_df is not None and not hold_df.empty:
-    annual_div = dividend_dollars_annual(hold_df, overrides=ovr)
-    hy = holdings_yield_pct(hold_df, overrides=ovr)
-    ey = etrade_like_yield_pct(hold_df, overrides=ovr)
-    mv_total = float(pd.to_numeric(hold_df["MV_$"], errors="coerce").fillna(0.0).sum())
+    base_stats = _portfolio_stats(hold_df, overrides=ovr)
 
     k1, k2, k3, k4 = st.columns(4, gap="medium")
-    k1.metric("Annual Dividend $ (est.)", fmt_money(annual_div))
-    k2.metric("Holdings MV $", fmt_money(mv_total))
-    k3.metric("Holdings Yield %", fmt_pct4(hy))
-    k4.metric("E*TRADE-like Yield %", fmt_pct4(ey))
+    k1.metric("Annual Dividend $ (est.)", fmt_money(base_stats["div"]))
+    k2.metric("Holdings MV $", fmt_money(base_stats["mv"]))
+    k3.metric("Holdings Yield %", fmt_pct4(base_stats["hy"]))
+    k4.metric("E*TRADE-like Yield %", fmt_pct4(base_stats["ey"]))
 else:
     st.info("Upload + PARSE to view yields and run what-if.")
 
@@ -1007,12 +1135,15 @@ def collect_buys():
     buys = []
     for i in range(N_BUYS):
         t = (st.session_state.get(f"buy_ticker_{i}") or "").strip().upper()
+        if not t:
+            continue  # untouched row: nothing to parse
         q = _to_float(st.session_state.get(f"buy_qty_{i}", "0"))
         q = float(q) if pd.notna(q) else 0.0
+        if q <= 0:
+            continue
         y = _to_float(st.session_state.get(f"buy_yield_{i}", "0"))
         y = float(y) if pd.notna(y) else 0.0
-        if t and q > 0:
-            buys.append({"ticker": t, "qty": q, "yield": y})
+        buys.append({"ticker": t, "qty": q, "yield": y})
     return buys
 
 if run_clicked:
@@ -1024,11 +1155,6 @@ if run_clicked:
             st.error("Enter at least 1 valid buy row (ticker + qty > 0).")
         else:
             try:
-                base_div = dividend_dollars_annual(hold_df, overrides=ovr)
-                old_hy = holdings_yield_pct(hold_df, overrides=ovr)
-                old_ey = etrade_like_yield_pct(hold_df, overrides=ovr)
-                old_mv_total = float(pd.to_numeric(hold_df["MV_$"], errors="coerce").fillna(0.0).sum())
-
                 pp_val = _to_float(st.session_state.get("pp_cash_str", "0"))
                 pp_val = float(pp_val) if pd.notna(pp_val) else 0.0
                 use_pp_first = bool(st.session_state.get("use_pp_first", True))
@@ -1041,9 +1167,7 @@ if run_clicked:
                 )
                 details_df = info.get("details_df")
 
-                new_div = dividend_dollars_annual(scen_df, overrides=ovr)
-                new_hy = holdings_yield_pct(scen_df, overrides=ovr)
-                new_ey = etrade_like_yield_pct(scen_df, overrides=ovr)
+                new_stats = _portfolio_stats(scen_df, overrides=ovr)
                 new_mv_total = float(info.get("holdings_total_mv", np.nan))
 
                 st.session_state.last_scenario_df = scen_df
@@ -1054,10 +1178,10 @@ if run_clicked:
                     sold_vmfxx_mv=info["total_sold_vmfxx_mv"],
                     shortfall_mv=info["total_shortfall_mv"],
                     pp_used_mv=info.get("total_pp_used_mv", 0.0),
-                    old_hy=old_hy, new_hy=new_hy,
-                    old_ey=old_ey, new_ey=new_ey,
-                    old_div=base_div, new_div=new_div,
-                    old_mv_total=old_mv_total, new_mv_total=new_mv_total,
+                    old_hy=base_stats["hy"], new_hy=new_stats["hy"],
+                    old_ey=base_stats["ey"], new_ey=new_stats["ey"],
+                    old_div=base_stats["div"], new_div=new_stats["div"],
+                    old_mv_total=base_stats["mv"], new_mv_total=new_mv_total,
                 )
 
                 st.success("Basket what-if calculated successfully.")
@@ -1075,7 +1199,7 @@ if isinstance(payload, dict):
 
     scen_df = st.session_state.last_scenario_df
     if isinstance(scen_df, pd.DataFrame) and not scen_df.empty:
-        scen_csv = scen_df.to_csv(index=False).encode("utf-8")
+        scen_csv = _df_to_csv_bytes(scen_df)
         st.download_button(
             "DOWNLOAD holdings_scenario.csv",
             data=scen_csv,
@@ -1092,7 +1216,7 @@ tabs = st.tabs(["HOLDINGS (Grouped)", "SCENARIO HOLDINGS"])
 with tabs[0]:
     if hold_df is not None and not hold_df.empty:
         st.dataframe(pretty_holdings(hold_df), use_container_width=True, hide_index=True)
-        csv_bytes = hold_df.to_csv(index=False).encode("utf-8")
+        csv_bytes = _df_to_csv_bytes(hold_df)
         st.download_button(
             "DOWNLOAD holdings_grouped.csv",
             data=csv_bytes,
@@ -3,16 +3,33 @@ from datetime import datetime, date
 import streamlit as st
 import yfinance as yf
 import pandas as pd
+import numpy as np
 
 # =========================
 # Helpers (no extra deps)
 # =========================
-def _norm_cdf(x: float) -> float:
-    return 0.5 * (1.0 + math.erf(x / math.sqrt(2.0)))
+_erf = np.frompyfunc(math.erf, 1, 1)
+
+def _norm_cdf(x: np.ndarray) -> np.ndarray:
+    return 0.5 * (1.0 + _erf(x / math.sqrt(2.0)).astype(np.float64))
 
 def _parse_exp_date(exp_str: str) -> date:
     return datetime.strptime(exp_str, "%Y-%m-%d").date()
 
+def _num_col(df: pd.DataFrame, col: str) -> np.ndarray:
+    # float64 view of a chain column; NaN where missing / non-numeric
+    if col not in df.columns:
+        return np.full(len(df), np.nan)
+    return pd.to_numeric(df[col], errors="coerce").to_numpy(dtype=np.float64)
+
+def _fmt_col(s: pd.Series, fmt: str) -> pd.Series:
+    # same as the Portfolio Hypo page's _fmt_col: one numeric coercion, blanks for NaN
+    v = pd.to_numeric(s, errors="coerce").to_numpy(dtype=np.float64, na_value=np.nan)
+    ok = ~np.isnan(v)
+    out = np.full(v.size, "", dtype=object)
+    out[ok] = [fmt.format(x) for x in v[ok]]
+    return pd.Series(out, index=s.index)
+
 def _safe_float(x, default=None):
     try:
         if pd.isna(x):
@@ -54,20 +71,34 @@ def _get_spot_price(ticker: yf.Ticker) -> float | None:
 def _risk_neutral_prob_itm_put(S, K, T, r, q, iv):
     """
     Risk-neutral probability put expires ITM: P(S_T < K) = N(-d2)
-    Black-Scholes. Returns None if inputs not usable.
+    Black-Scholes over a chain: K / iv are arrays, S / T scalars.
+    NaN where inputs not usable.
     """
-    if not S or not K or not T or T <= 0:
-        return None
-    if iv is None or iv <= 0:
-        return None
-
-    try:
+    out = np.full(K.shape, np.nan)
+    if not S or not T or T <= 0:
+        return out
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ok = (K != 0) & (iv > 0) & (S / K > 0)
+    if ok.any():
+        k, v = K[ok], iv[ok]
         sqrtT = math.sqrt(T)
-        d1 = (math.log(S / K) + (r - q + 0.5 * iv * iv) * T) / (iv * sqrtT)
-        d2 = d1 - iv * sqrtT
-        return _norm_cdf(-d2)
-    except Exception:
-        return None
+        d1 = (np.log(S / k) + (r - q + 0.5 * v * v) * T) / (v * sqrtT)
+        d2 = d1 - v * sqrtT
+        out[ok] = _norm_cdf(-d2)
+    return out
+
+def _prob_assign_est(S, K, T, r, q, iv):
+    """
+    Black-Scholes N(-d2) where usable, else a moneyness heuristic
+    (0.5 * e^(-10 * %OTM), clamped to 1%..99%). NaN when neither applies.
+    """
+    p = _risk_neutral_prob_itm_put(S, K, T, r, q, iv)
+    if S and S > 0:
+        fb = np.isnan(p) & (K != 0) & ~np.isnan(K)
+        m = np.maximum(0.0, (S - K[fb]) / S)
+        p[fb] = np.clip(0.5 * np.exp(-10.0 * m), 0.01, 0.99)
+    return p
 
 # =========================
 # Core: fetch + CSP analysis
@@ -196,27 +227,11 @@ def fetch_puts_with_analysis(
                 axis=1
             )
 
-            def prob_assign_row(r_):
-                S = _safe_float(r_.get("Spot"))
-                K = _safe_float(r_.get("Strike"))
-                iv = _safe_float(r_.get("IV"))
-                T = _safe_float(r_.get("DTE"))
-                if T is not None:
-                    T = T / 365.0
-
-                p_itm = _risk_neutral_prob_itm_put(S, K, T, r, q, iv)
-                if p_itm is not None:
-                    return p_itm
-
-                if S and K and S > 0:
-                    m = (S - K) / S
-                    return max(0.01, min(0.99, 0.5 * math.exp(-10.0 * max(0.0, m))))
-                return None
-
-            puts["Prob Assign (Est)"] = puts.apply(prob_assign_row, axis=1)
-            puts["Prob Expire W/O Assign (Est)"] = puts["Prob Assign (Est)"].apply(
-                lambda x: (1.0 - x) if x is not None and not pd.isna(x) else None
+            # whole chain at once (spot and DTE are the same for every row)
+            puts["Prob Assign (Est)"] = _prob_assign_est(
+                _safe_float(spot), _num_col(puts, "Strike"), dte / 365.0, r, q, _num_col(puts, "IV")
             )
+            puts["Prob Expire W/O Assign (Est)"] = 1.0 - puts["Prob Assign (Est)"]
 
             def csp_score_row(r_):
                 ay = _safe_float(r_.get("Ann. Yield % (Bid)"))
@@ -349,41 +364,25 @@ def main():
 
         fmt = view[display_cols].copy()
 
-        def pct(x):
-            return "" if pd.isna(x) else f"{x*100:,.1f}%"
-
-        def pct100(x):
-            return "" if pd.isna(x) else f"{x:,.2f}%"
-
-        def money(x):
-            return "" if pd.isna(x) else f"${x:,.2f}"
-
-        def money0(x):
-            return "" if pd.isna(x) else f"${x:,.0f}"
-
-        if "Spot" in fmt.columns: fmt["Spot"] = fmt["Spot"].apply(money)
-        if "Strike" in fmt.columns: fmt["Strike"] = fmt["Strike"].apply(money)
-        if "Bid Price" in fmt.columns: fmt["Bid Price"] = fmt["Bid Price"].apply(money)
-        if "Ask Price" in fmt.columns: fmt["Ask Price"] = fmt["Ask Price"].apply(money)
-        if "BE (Bid)" in fmt.columns: fmt["BE (Bid)"] = fmt["BE (Bid)"].apply(money)
-        if "Cash Req ($)" in fmt.columns: fmt["Cash Req ($)"] = fmt["Cash Req ($)"].apply(money0)
-
-        if "% OTM" in fmt.columns:
-            fmt["% OTM"] = fmt["% OTM"].apply(lambda x: "" if pd.isna(x) else f"{x*100:,.1f}%")
-
-        for c in ["Yield % (Bid)", "Ann. Yield % (Bid)"]:
+        # "%" format = x * 100 with a trailing %, same as the old f"{x*100:,.1f}%"
+        col_fmt = {
+            "Spot": "${:,.2f}",
+            "Strike": "${:,.2f}",
+            "Bid Price": "${:,.2f}",
+            "Ask Price": "${:,.2f}",
+            "BE (Bid)": "${:,.2f}",
+            "Cash Req ($)": "${:,.0f}",
+            "% OTM": "{:,.1%}",
+            "Yield % (Bid)": "{:,.2f}%",
+            "Ann. Yield % (Bid)": "{:,.2f}%",
+            "Prob Assign (Est)": "{:,.1%}",
+            "Prob Expire W/O Assign (Est)": "{:,.1%}",
+            "IV": "{:,.1%}",
+            "CSP Score": "{:,.2f}",
+        }
+        for c, spec in col_fmt.items():
             if c in fmt.columns:
-                fmt[c] = fmt[c].apply(pct100)
-
-        for c in ["Prob Assign (Est)", "Prob Expire W/O Assign (Est)"]:
-            if c in fmt.columns:
-                fmt[c] = fmt[c].apply(pct)
-
-        if "IV" in fmt.columns:
-            fmt["IV"] = fmt["IV"].apply(lambda x: "" if pd.isna(x) else f"{x*100:,.1f}%")
-
-        if "CSP Score" in fmt.columns:
-            fmt["CSP Score"] = fmt["CSP Score"].apply(lambda x: "" if pd.isna(x) else f"{x:,.2f}")
+                fmt[c] = _fmt_col(fmt[c], spec)
 
         st.subheader("Top CSP candidates (filtered + ranked)")
         st.dataframe(fmt, use_container_width=True, hide_index=True)
@@ -148,23 +148,42 @@ def calculate_days_left(expiration_date):
     expiration_date = datetime.strptime(expiration_date, "%Y-%m-%d")
     return (expiration_date - today).days
 
+@st.cache_data(ttl=300, show_spinner=False)
+def get_expiration_dates(ticker_symbol):
+    """Option expiration dates (cached so reruns skip the Yahoo round-trip)."""
+    return yf.Ticker(ticker_symbol).options
+
+@st.cache_data(ttl=60, show_spinner=False)
+def get_puts(ticker_symbol, expiration_date):
+    """Put chain for one expiration date."""
+    return yf.Ticker(ticker_symbol).option_chain(expiration_date).puts
+
+@st.cache_data(ttl=60, show_spinner=False)
+def get_spot_price(ticker_symbol):
+    """Latest close, or 0.0 when no history comes back."""
+    stock_info = yf.Ticker(ticker_symbol).history(period="1d")
+    return float(stock_info["Close"].iloc[-1]) if not stock_info.empty else 0.0
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def get_long_name(ticker_symbol):
+    """Company long name from ticker info."""
+    return yf.Ticker(ticker_symbol).info.get("longName", "N/A")
+
 def display_put_options_all_dates(ticker_symbol, stock_price):
     try:
-        ticker = yf.Ticker(ticker_symbol)
-        expiration_dates = ticker.options
+        expiration_dates = get_expiration_dates(ticker_symbol)
         if not expiration_dates:
             st.error(f"No options data available for ticker {ticker_symbol}.")
             return
 
-        all_data = pd.DataFrame()
+        all_tables = []  # concatenated once after the loop
 
         for chosen_date in expiration_dates:
             days_left = calculate_days_left(chosen_date)
             st.markdown(f"### EXPIRATION: {chosen_date}  ·  {days_left} DAYS LEFT")
 
             # Fetch put options
-            options_chain = ticker.option_chain(chosen_date)
-            puts = options_chain.puts
+            puts = get_puts(ticker_symbol, chosen_date)
 
             if puts.empty:
                 st.warning(f"No puts available for expiration date {chosen_date}.")
@@ -194,7 +213,7 @@ def display_put_options_all_dates(ticker_symbol, stock_price):
             display_table = display_table.reset_index(drop=True)
 
             # Collect everything for CSV
-            all_data = pd.concat([all_data, puts_table], ignore_index=True)
+            all_tables.append(puts_table)
 
             # Format numeric columns with no decimals
             num_cols = [c for c in ["STK", "CPA", "MLA", "CPL", "MLL"] if c in display_table.columns]
@@ -245,6 +264,7 @@ def display_put_options_all_dates(ticker_symbol, stock_price):
 
             st.dataframe(styled_table, use_container_width=True, height=280)
 
+        all_data = pd.concat(all_tables, ignore_index=True) if all_tables else pd.DataFrame()
         if not all_data.empty:
             csv = all_data.to_csv(index=False)
             st.download_button(
@@ -277,10 +297,8 @@ def main():
 
     if ticker_symbol:
         try:
-            ticker = yf.Ticker(ticker_symbol)
-            long_name = ticker.info.get("longName", "N/A")
-            stock_info = ticker.history(period="1d")
-            current_price = stock_info["Close"].iloc[-1] if not stock_info.empty else 0.0
+            long_name = get_long_name(ticker_symbol)
+            current_price = get_spot_price(ticker_symbol)
         except Exception:
             long_name = "N/A"
             current_price = 0.0
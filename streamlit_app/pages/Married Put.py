@@ -45,26 +45,43 @@ def calculate_trading_days_left(expiration_date):
     expiration_date = datetime.strptime(expiration_date, "%Y-%m-%d")
     return (expiration_date - today).days
 
+@st.cache_data(ttl=300, show_spinner=False)
+def get_expiration_dates(ticker_symbol):
+    """Option expiration dates (cached so reruns skip the Yahoo round-trip)."""
+    return yf.Ticker(ticker_symbol).options
+
+@st.cache_data(ttl=60, show_spinner=False)
+def get_puts(ticker_symbol, expiration_date):
+    """Put chain for one expiration date."""
+    return yf.Ticker(ticker_symbol).option_chain(expiration_date).puts
+
+@st.cache_data(ttl=60, show_spinner=False)
+def get_spot_price(ticker_symbol):
+    """Latest close, or 0.0 when no history comes back."""
+    stock_info = yf.Ticker(ticker_symbol).history(period="1d")
+    return float(stock_info["Close"].iloc[-1]) if not stock_info.empty else 0.0
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def get_long_name(ticker_symbol):
+    """Company long name from ticker info."""
+    return yf.Ticker(ticker_symbol).info.get("longName", "N/A")
+
 def display_put_options_all_dates(ticker_symbol, stock_price):
     try:
-        # Fetch Ticker object
-        ticker = yf.Ticker(ticker_symbol)
-
         # Fetch available expiration dates
-        expiration_dates = ticker.options
+        expiration_dates = get_expiration_dates(ticker_symbol)
         if not expiration_dates:
             st.error(f"No options data available for ticker {ticker_symbol}.")
             return
 
-        all_data = pd.DataFrame()
+        all_tables = []  # concatenated once after the loop
 
         for chosen_date in expiration_dates:
             trading_days_left = calculate_trading_days_left(chosen_date)
             st.subheader(f"Expiration Date: {chosen_date} ({trading_days_left} trading days left)")
 
             # Fetch put options for the current expiration date
-            options_chain = ticker.option_chain(chosen_date)
-            puts = options_chain.puts
+            puts = get_puts(ticker_symbol, chosen_date)
 
             if puts.empty:
                 st.warning(f"No puts available for expiration date {chosen_date}.")
@@ -78,8 +95,8 @@ def display_put_options_all_dates(ticker_symbol, stock_price):
             # Calculate max loss for each option
             puts_table = calculate_max_loss(stock_price, puts_table)
 
-            # Append data to main DataFrame
-            all_data = pd.concat([all_data, puts_table], ignore_index=True)
+            # Collect for the combined CSV download
+            all_tables.append(puts_table)
 
             # Highlight Max Loss columns
             styled_table = puts_table.style.highlight_max(
@@ -87,6 +104,7 @@ def display_put_options_all_dates(ticker_symbol, stock_price):
             )
             st.dataframe(styled_table)
 
+        all_data = pd.concat(all_tables, ignore_index=True) if all_tables else pd.DataFrame()
         if not all_data.empty:
             # Allow downloading the complete table as a CSV file
             csv = all_data.to_csv(index=False)
@@ -111,8 +129,7 @@ def main():
     # Display the long name of the ticker symbol
     if ticker_symbol:
         try:
-            ticker = yf.Ticker(ticker_symbol)
-            long_name = ticker.info.get("longName", "N/A")
+            long_name = get_long_name(ticker_symbol)
             st.write(f"**Company Name:** {long_name}")
         except Exception as e:
             st.warning(f"Unable to fetch company name: {e}")
@@ -123,9 +140,7 @@ def main():
 
     # Automatically fetch the current stock price
     try:
-        ticker = yf.Ticker(ticker_symbol)
-        stock_info = ticker.history(period="1d")
-        current_price = stock_info["Close"].iloc[-1] if not stock_info.empty else 0.0
+        current_price = get_spot_price(ticker_symbol)
     except Exception:
         current_price = 0.0
 
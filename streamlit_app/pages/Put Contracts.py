@@ -9,7 +9,7 @@ def get_put_options_data(ticker_symbol):
         st.error(f"No options data available for ticker {ticker_symbol}.")
         return pd.DataFrame()
     
-    all_options = pd.DataFrame()
+    all_options = []  # concatenated once after the loop
     
     for exp_date in expiration_dates:
         st.subheader(f"Expiration Date: {exp_date}")
@@ -28,11 +28,11 @@ def get_put_options_data(ticker_symbol):
             # Display the table in Streamlit
             st.dataframe(puts)
             
-            all_options = pd.concat([all_options, puts], ignore_index=True)
+            all_options.append(puts)
         except Exception as e:
             st.error(f"Error processing expiration date {exp_date}: {e}")
     
-    return all_options
+    return pd.concat(all_options, ignore_index=True) if all_options else pd.DataFrame()
 
 def main():
     st.title("Options Put Data Viewer")
@@ -180,19 +180,16 @@ def street_fair_values_for_etf(etf_price: float, spx_price: float, bank_targets:
     return {bank: k * float(target) for bank, target in bank_targets.items()}
 
 
-def color_upsides(val):
-    if pd.isna(val):
-        return ""
-    try:
-        v = float(val)
-    except ValueError:
-        return ""
-    if v > 0.5:
-        return "color: #08ff7e; font-weight: 600;"
-    elif v < -0.5:
-        return "color: #ff4d4d; font-weight: 600;"
-    else:
-        return "color: #aaaaaa;"
+def sign_colors(frame: pd.DataFrame, band: float = 0.0) -> pd.DataFrame:
+    """
+    CSS for a whole block (Styler.apply with axis=None): green above +band,
+    red below -band, grey in between, blank for missing / non-numeric cells.
+    """
+    v = frame.apply(pd.to_numeric, errors="coerce")
+    css = pd.DataFrame("color: #aaaaaa;", index=frame.index, columns=frame.columns)
+    css = css.mask(v > band, "color: #08ff7e; font-weight: 600;")
+    css = css.mask(v < -band, "color: #ff4d4d; font-weight: 600;")
+    return css.mask(v.isna(), "")
 
 
 @st.cache_data(ttl=600)
@@ -511,20 +508,6 @@ for p in globe_points:
 
 global_df = pd.DataFrame(global_rows)
 
-def color_change(val):
-    if pd.isna(val):
-        return ""
-    try:
-        v = float(val)
-    except ValueError:
-        return ""
-    if v > 0:
-        return "color: #08ff7e; font-weight: 600;"
-    elif v < 0:
-        return "color: #ff4d4d; font-weight: 600;"
-    else:
-        return "color: #aaaaaa;"
-
 st.subheader("GLOBAL MARKETS SNAPSHOT")
 if not global_df.empty:
     styled_global = (
@@ -537,7 +520,7 @@ if not global_df.empty:
                 "From 52W High%": "{:+.2f}",
             }
         )
-        .applymap(color_change, subset=["1D%", "5D%", "From 52W High%"])
+        .apply(sign_colors, axis=None, subset=["1D%", "5D%", "From 52W High%"])
     )
     st.dataframe(styled_global, use_container_width=True, height=340)
 else:
@@ -607,7 +590,7 @@ if show_banks:
                 "Ups_B%": "{:,.2f}",
             }
         )
-        .applymap(color_upsides, subset=["Ups_M%", "Ups_S%", "Ups_B%"])
+        .apply(sign_colors, axis=None, subset=["Ups_M%", "Ups_S%", "Ups_B%"], band=0.5)
     )
 else:
     styled = (
@@ -619,7 +602,7 @@ else:
                 "Ups_M%": "{:,.2f}",
             }
         )
-        .applymap(color_upsides, subset=["Ups_M%"])
+        .apply(sign_colors, axis=None, subset=["Ups_M%"], band=0.5)
     )
 
 st.subheader("FAIR VALUE SNAPSHOT (LIVE)")